@@ -1,14 +1,43 @@
+import atexit
 import os
 import io
+import hashlib
 import json
+import mmap
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+import cv2
 import numpy as np
 from PIL import Image
-from flask import Flask, request, render_template_string, redirect, url_for
+from flask import Flask, request, redirect, url_for
 import requests
 
+# ---------- CPU threading (must be set before TensorFlow loads) ----------
+# One thread pool sized to the CPUs this process may use, instead of TF's
+# default of every logical core for both intra- and inter-op pools.
+_sched_getaffinity = getattr(os, "sched_getaffinity", None)  # Linux only
+INTRA_OP_THREADS = int(os.getenv("INTRA") or 0) or (
+    len(_sched_getaffinity(0)) if _sched_getaffinity else os.cpu_count() or 1
+)
+os.environ.setdefault("OMP_NUM_THREADS", str(INTRA_OP_THREADS))
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+os.environ.setdefault("KMP_BLOCKTIME", "1")
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+# Request threads resize concurrently; don't let each fan out over every core
+# on OpenCV's own pool and compete with the TFLite threads above
+cv2.setNumThreads(int(os.getenv("CV_THREADS") or 1))
+
 # Keras/TensorFlow
+import tensorflow as tf
 from tensorflow.keras.models import load_model
 
+tf.config.threading.set_intra_op_parallelism_threads(INTRA_OP_THREADS)
+tf.config.threading.set_inter_op_parallelism_threads(1)
+
 # Firebase
 import firebase_admin
 from firebase_admin import credentials, firestore
@@ -29,40 +58,352 @@ if sa_json:
 else:
     print("⚠️ SA_JSON not found. Firebase not initialized.")
 
-# ---------- Model (lazy download + lazy load) ----------
+# Firestore writes are queued and committed in batches; requests never wait on them
+WRITE_BATCH_MAX = 500  # Firestore's limit per batched write
+WRITE_BATCH_WAIT_MS = 200
+
+# ---------- TurboJPEG (optional, needs the libturbojpeg system library) ----------
+jpeg = None
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+
+    jpeg = TurboJPEG()
+    print("✅ TurboJPEG decoder available")
+except Exception as e:
+    print("⚠️ TurboJPEG unavailable, decoding JPEGs with PIL:", e)
+
+# ---------- Model (prepared at server start, loaded per worker) ----------
 MODEL_URL = (
     "https://www.dropbox.com/scl/fi/zq3rd08qztt52sad61m30/"
     "skin_type_classifier.h5?rlkey=wagg56ok83eu8d1ay25o1g3pr&st=7tzintp0&dl=1"
 )
 MODEL_PATH = "skin_type_classifier.h5"
-LABELS = ["Dry", "Normal", "Oily"]
+# Bump the version whenever the conversion changes the model's input contract.
+# {quant} is "int8" or "dynamic", so changing the calibration set never reuses
+# an artifact built in the other mode.
+TFLITE_PATH = "skin_type_classifier_v3_{quant}.tflite"
+LABELS = np.array(["Dry", "Normal", "Oily"])
 IMG_SIZE = (224, 224)
+# A handful of sample face images used to calibrate INT8 quantization
+CALIBRATION_DIR = os.getenv("CALIBRATION_DIR", "calibration")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+# Micro-batching: coalesce concurrent requests into one interpreter call
+BATCH_MAX = int(os.getenv("BATCH_MAX", "16"))
+BATCH_WAIT_MS = float(os.getenv("BATCH_WAIT_MS", "10"))
+# Labels for recently seen uploads, keyed by content hash
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "1024"))
+
+_interpreter = None  # lazy-loaded
+_infer = None  # inference fn, built alongside _interpreter
+_infer_lock = threading.Lock()  # tf.lite.Interpreter is not thread-safe
+
+def calibration_images(folder=CALIBRATION_DIR):
+    """List the sample images available for INT8 calibration."""
+    if not os.path.isdir(folder):
+        return []
+    return [
+        os.path.join(folder, name)
+        for name in sorted(os.listdir(folder))
+        if name.lower().endswith(IMAGE_EXTS)
+    ]
 
-_model = None  # lazy-loaded
+def representative_dataset():
+    """Yield calibration images as raw 0-255 pixels, the serving model's input.
 
-def ensure_model_file(path=MODEL_PATH, url=MODEL_URL):
-    """Download the model once if missing."""
+    A synthetic 0..255 ramp goes first. Resized photos rarely reach exact 0
+    and 255, and pinning the full range makes the uint8 input quantize with
+    exactly scale=1, zero_point=0, so raw pixels pass through unchanged.
+    """
+    ramp = np.linspace(0, 255, IMG_SIZE[0] * IMG_SIZE[1] * 3, dtype=np.float32)
+    yield [ramp.reshape(1, *IMG_SIZE, 3)]
+    for path in calibration_images():
+        with open(path, "rb") as f:
+            yield [preprocess_image(f).astype(np.float32)]
+
+def build_serving_model(h5_path=MODEL_PATH, uint8_input=True):
+    """Load the Keras model with the /255 normalization folded into the graph.
+
+    With uint8_input the model takes uint8 pixels and casts them in-graph.
+    The INT8 build passes False: a CAST at the input doesn't survive
+    full-integer quantization, and the converter's uint8 input type covers it.
+    """
+    model = load_model(h5_path, compile=False)
+    if uint8_input:
+        inp = tf.keras.Input((*IMG_SIZE, 3), dtype="uint8")
+        x = tf.keras.ops.cast(inp, "float32")
+    else:
+        inp = x = tf.keras.Input((*IMG_SIZE, 3), dtype="float32")
+    out = model(tf.keras.layers.Rescaling(1.0 / 255)(x))
+    return tf.keras.Model(inp, out)
+
+def ensure_model_file(path=None, h5_path=MODEL_PATH, url=MODEL_URL):
+    """Download the Keras model and convert it to TFLite once if missing.
+
+    Without an explicit path, the artifact name follows the quantization mode
+    the calibration data allows (INT8 only when calibration images exist).
+    """
+    int8 = bool(calibration_images())
+    if path is None:
+        path = TFLITE_PATH.format(quant="int8" if int8 else "dynamic")
     if os.path.exists(path) and os.path.getsize(path) > 1024:
         return path
-    print("📥 Downloading model from Dropbox...")
-    with requests.get(url, stream=True, timeout=300) as r:
-        r.raise_for_status()
-        with open(path, "wb") as f:
-            for chunk in r.iter_content(8192):
-                if chunk:
-                    f.write(chunk)
-    print("✅ Model downloaded:", path)
+    if not (os.path.exists(h5_path) and os.path.getsize(h5_path) > 1024):
+        print("📥 Downloading model from Dropbox...")
+        with requests.get(url, stream=True, timeout=300) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True  # still undo any gzip/deflate transfer encoding
+            # Download to .tmp so an interrupted transfer never looks complete
+            tmp_h5 = h5_path + ".tmp"
+            with open(tmp_h5, "wb") as f:
+                shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+        os.replace(tmp_h5, h5_path)
+        print("✅ Model downloaded:", h5_path)
+    print("🔧 Converting model to TFLite...")
+    converter = tf.lite.TFLiteConverter.from_keras_model(build_serving_model(h5_path, uint8_input=not int8))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if int8:
+        # Full-integer model: int8 weights/activations, raw uint8 pixels in.
+        # The Rescaling layer folds into the input quantization params.
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+    else:
+        print("⚠️ No calibration images in", CALIBRATION_DIR, "- using dynamic-range quantization.")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(converter.convert())
+    os.replace(tmp_path, path)
+    print("✅ Model converted:", path)
     return path
 
 def get_model():
-    """Load the model on first use to keep startup light."""
-    global _model
-    if _model is not None:
-        return _model
-    ensure_model_file()
-    _model = load_model(MODEL_PATH)
+    """Load and warm the TFLite interpreter once per process.
+
+    Under Gunicorn this runs in post_fork, before the worker takes traffic;
+    otherwise (dev server, or a failed warm-up) on the first request.
+
+    Returns an inference function mapping a (B, 224, 224, 3) uint8 batch,
+    B <= BATCH_MAX, to per-class scores.
+    """
+    global _interpreter, _infer
+    if _infer is not None:
+        return _infer
+    interpreter = tf.lite.Interpreter(model_path=ensure_model_file(), num_threads=INTRA_OP_THREADS)
+    interpreter.allocate_tensors()
+    input_details = interpreter.get_input_details()[0]
+    input_idx = input_details["index"]
+    output_idx = interpreter.get_output_details()[0]["index"]
+    input_shape = [tuple(input_details["shape"])]
+    input_dtype = input_details["dtype"]
+    scale, zero_point = input_details["quantization"]
+    # Both builds take uint8 pixels. The dynamic-range input is unquantized
+    # (scale 0); the INT8 calibration ramp pins its range to 0..255 (scale 1,
+    # zero_point 0). Anything else gets re-quantized below.
+    if input_dtype != np.uint8:
+        raise RuntimeError(f"Expected a uint8-input model, got {input_dtype.__name__}")
+    passthrough = scale == 0 or (np.isclose(scale, 1.0) and zero_point == 0)
+    # Reused scratch/output buffers for re-quantization
+    float_buf = quant_buf = None
+    if not passthrough:
+        float_buf = np.empty((BATCH_MAX, *IMG_SIZE, 3), dtype=np.float32)
+        quant_buf = np.empty_like(float_buf, dtype=np.uint8)
+
+    def infer(x):
+        with _infer_lock:
+            if passthrough:
+                x = np.asarray(x, dtype=np.uint8)
+            else:
+                tmp, out = float_buf[: len(x)], quant_buf[: len(x)]
+                np.divide(x, scale, out=tmp)
+                np.add(tmp, zero_point, out=tmp)
+                np.rint(tmp, out=tmp)
+                np.clip(tmp, 0, 255, out=tmp)
+                np.copyto(out, tmp, casting="unsafe")
+                x = out
+            # Only re-allocate when the batch size actually changes
+            if x.shape != input_shape[0]:
+                interpreter.resize_tensor_input(input_idx, x.shape)
+                interpreter.allocate_tensors()
+                input_shape[0] = x.shape
+            interpreter.set_tensor(input_idx, x)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_idx)
+
+    # Warm-up call so the first real request doesn't pay the allocation cost
+    infer(np.zeros((1, *IMG_SIZE, 3), dtype=np.uint8))
+    _interpreter, _infer = interpreter, infer
     print("✅ Model loaded into memory")
-    return _model
+    return _infer
+
+# ---------- Micro-batcher ----------
+class _Job:
+    """One queued image plus the slot its label is written to."""
+    __slots__ = ("x", "done", "result", "error")
+
+    def __init__(self, x):
+        self.x = x
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_batch_queue = queue.Queue()
+_batcher = None
+_batcher_lock = threading.Lock()
+# Batch input buffer, reused for every batch; only the batcher thread touches it
+_batch_buf = np.empty((BATCH_MAX, *IMG_SIZE, 3), dtype=np.uint8)
+
+def drain_queue(q, max_items, wait_ms):
+    """Block for one item, then collect more until max_items or wait_ms elapses."""
+    items = [q.get()]
+    deadline = time.monotonic() + wait_ms / 1000.0
+    while len(items) < max_items:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            items.append(q.get(timeout=timeout))
+        except queue.Empty:
+            break
+    return items
+
+def _batch_worker():
+    """Drain up to BATCH_MAX jobs (or BATCH_WAIT_MS) and run them as one batch."""
+    while True:
+        jobs = drain_queue(_batch_queue, BATCH_MAX, BATCH_WAIT_MS)
+        try:
+            for i, job in enumerate(jobs):
+                np.copyto(_batch_buf[i], job.x[0])
+            preds = get_model()(_batch_buf[: len(jobs)])
+            # One vectorized lookup for the whole batch
+            for job, label in zip(jobs, LABELS[preds.argmax(axis=1)]):
+                job.result = label
+        except Exception as e:
+            for job in jobs:
+                job.error = e
+        for job in jobs:
+            job.done.set()
+
+def start_batcher():
+    """Start the batching thread once per process."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = threading.Thread(target=_batch_worker, name="batcher", daemon=True)
+            _batcher.start()
+
+def classify(x):
+    """Queue a preprocessed (1, 224, 224, 3) image and wait for its label."""
+    start_batcher()
+    job = _Job(x)
+    _batch_queue.put(job)
+    job.done.wait()
+    if job.error is not None:
+        # One exception object is shared by every job in the failed batch;
+        # give each waiter its own so concurrent raises don't share a traceback
+        raise RuntimeError(f"batched inference failed: {job.error}") from job.error
+    return job.result
+
+# ---------- Firestore batched writes ----------
+_write_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+_STOP_WRITER = object()  # queued by flush_records() to drain and stop the writer
+
+def _commit_records(records):
+    """Commit (user_id, label) records as one batch, skipping invalid ones.
+
+    A failed commit is retried once; if that fails too, the affected
+    user_ids are logged.
+    """
+    writes = []
+    for user_id, label in records:
+        try:
+            # uid comes from the query string; e.g. "a/b" is not a valid document path
+            ref = db.collection("users").document(user_id).collection("skin_records").document()
+        except Exception as e:
+            print(f"❌ Skipping skin record for uid {user_id!r}:", e, file=sys.stderr)
+            continue
+        writes.append((user_id, ref, {"skin_type": label, "timestamp": firestore.SERVER_TIMESTAMP}))
+    if not writes:
+        return
+    for _ in range(2):
+        batch = db.batch()
+        for _, ref, data in writes:
+            batch.set(ref, data)
+        try:
+            batch.commit()
+            return
+        except Exception as e:
+            error = e
+    user_ids = sorted({user_id for user_id, _, _ in writes})
+    print(f"❌ Firestore batch of {len(writes)} records failed for uids {user_ids}:", error, file=sys.stderr)
+
+def _write_worker():
+    """Commit queued skin records with one batched write per drain.
+
+    Returns after committing everything queued ahead of _STOP_WRITER.
+    """
+    while True:
+        records = drain_queue(_write_queue, WRITE_BATCH_MAX, WRITE_BATCH_WAIT_MS)
+        stop = any(record is _STOP_WRITER for record in records)
+        records = [record for record in records if record is not _STOP_WRITER]
+        try:
+            _commit_records(records)
+        except Exception as e:  # never let the writer thread die
+            print(f"❌ Firestore batch of {len(records)} records failed:", e, file=sys.stderr)
+        if stop:
+            return
+
+def flush_records(timeout=10.0):
+    """Commit every queued record and stop the writer; safe to call repeatedly.
+
+    Runs at interpreter exit and from Gunicorn's worker_exit hook, so records
+    still waiting out the batch window survive restarts and deploys.
+    """
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return
+    _write_queue.put(_STOP_WRITER)
+    writer.join(timeout)
+    if writer.is_alive():
+        print("⚠️ Firestore writer did not finish flushing before exit.", file=sys.stderr)
+
+atexit.register(flush_records)
+
+def save_record(user_id, label):
+    """Queue a skin record for the next batched Firestore commit."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_worker, name="firestore-writer", daemon=True)
+            _writer.start()
+    _write_queue.put((user_id, label))
+
+# ---------- Result cache (shared by all request threads in a worker) ----------
+_label_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def image_key(buf):
+    """blake2b digest of an upload's bytes (see upload_buffer)."""
+    return hashlib.blake2b(buf, digest_size=16).digest()
+
+def cached_label(key):
+    """Return the cached label for key (marking it recently used), or None."""
+    with _cache_lock:
+        label = _label_cache.get(key)
+        if label is not None:
+            _label_cache.move_to_end(key)
+        return label
+
+def cache_label(key, label):
+    """Remember key -> label, evicting the least recently used entry when full."""
+    with _cache_lock:
+        _label_cache[key] = label
+        _label_cache.move_to_end(key)
+        if len(_label_cache) > CACHE_SIZE:
+            _label_cache.popitem(last=False)
 
 # ---------- HTML ----------
 HTML_FORM = """
@@ -104,19 +445,118 @@ HTML_FORM = """
 </html>
 """
 
+RESULT_HTML = """
+<!doctype html>
+<html>
+<head>
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>GlowCheck Result</title>
+  <style>
+    body { background: linear-gradient(135deg,#e6f0f2,#f8f8f8); font-family:'Poppins',sans-serif;
+          display:flex; justify-content:center; align-items:center; height:100vh; margin:0; }
+    .result-card { position:fixed; top:40px; left:50%; transform:translateX(-50%); background:#fff;
+                   padding:25px 20px; border-radius:15px; box-shadow:0 6px 18px rgba(0,0,0,.1);
+                   text-align:center; width:90%; max-width:360px; border:1px solid #7dacb5; }
+    h3 { color:#5A827E; font-size:22px; font-weight:600; margin-bottom:25px; }
+    a { text-decoration:none; color:#fff; background:#5A827E; padding:12px 20px; border-radius:10px;
+        display:inline-block; transition:.3s; }
+    a:hover { transform:scale(1.05); background:#4e6f6b; }
+  </style>
+</head>
+<body>
+  <div class="result-card">
+    <h3>Your Skin Type: {{ label }}</h3>
+    <a href="/?uid={{ uid }}">Try Another</a>
+  </div>
+</body>
+</html>
+"""
+
+# Compiled once at import; render_template_string would re-parse on every call
+_FORM_TMPL = app.jinja_env.from_string(HTML_FORM)
+_RESULT_TMPL = app.jinja_env.from_string(RESULT_HTML)
+
 # ---------- Helpers ----------
-def preprocess_image(image_bytes):
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    img = img.resize(IMG_SIZE)
-    arr = np.array(img) / 255.0
-    arr = np.expand_dims(arr, axis=0)
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+def jpeg_scaling_factor(width, height):
+    """Smallest TurboJPEG decode scale that keeps the short side >= IMG_SIZE."""
+    short_side, target = min(width, height), min(IMG_SIZE)
+    best = (1, 1)
+    for num, denom in jpeg.scaling_factors:
+        scaled = -(-short_side * num // denom)  # libjpeg rounds scaled sizes up
+        if scaled >= target and num * best[1] < best[0] * denom:
+            best = (num, denom)
+    return best
+
+def decode_jpeg(image_bytes):
+    """Decode a JPEG to an RGB array with TurboJPEG, downscaling during decode.
+
+    Returns None if TurboJPEG can't handle the file.
+    """
+    try:
+        width, height, _, _ = jpeg.decode_header(image_bytes)
+        arr = jpeg.decode(
+            image_bytes,
+            pixel_format=TJPF_RGB,
+            scaling_factor=jpeg_scaling_factor(width, height),
+        )
+    except OSError:
+        return None  # e.g. CMYK or truncated files; PIL copes with those
     return arr
 
+def upload_buffer(stream):
+    """Whole stream as one bytes-like object, reading it at most once.
+
+    Werkzeug spools uploads over 500 KB to a temp file; those (and plain
+    files) are mmapped instead of copied. Smaller, in-memory uploads are read.
+    """
+    # Relies on two behaviours:
+    # - Werkzeug 3's default_stream_factory always hands FileStorage a
+    #   tempfile.SpooledTemporaryFile (500 KB threshold). Its public fileno()
+    #   rolls an in-memory upload over to disk, so calling it unconditionally
+    #   would add a disk write to every small upload. The only way to tell
+    #   whether it has already rolled is CPython's private `_rolled` flag.
+    #   Plain files have no such flag and are treated as on disk.
+    # - A rolled file may still hold written bytes in its userspace buffer.
+    #   seek(0) flushes them (Werkzeug also seeks to 0 after spooling), so the
+    #   mmap sees the whole upload.
+    if getattr(stream, "_rolled", True):
+        try:
+            stream.seek(0)
+            return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            pass  # no real file descriptor, or an empty file
+    stream.seek(0)
+    return stream.read()
+
+def preprocess_image(stream, buf=None):
+    """Decode a seekable image stream into a (1, 224, 224, 3) uint8 batch.
+
+    buf is the stream's upload_buffer(), if the caller already has one.
+    """
+    arr = None
+    if jpeg is not None:
+        if buf is None:
+            buf = upload_buffer(stream)
+        if buf[: len(JPEG_MAGIC)] == JPEG_MAGIC:
+            arr = decode_jpeg(buf)
+    if arr is None:
+        stream.seek(0)
+        img = Image.open(stream)
+        # JPEG fast path: let the decoder downscale (1/2..1/8) while decoding
+        img.draft("RGB", IMG_SIZE)
+        arr = np.asarray(img.convert("RGB"), dtype=np.uint8)
+    # INTER_AREA antialiases big phone-photo downscales, in OpenCV's SIMD kernels.
+    # Raw uint8 pixels out; scaling happens at the model input.
+    arr = cv2.resize(arr, IMG_SIZE, interpolation=cv2.INTER_AREA)
+    return np.expand_dims(arr, axis=0)
+
 # ---------- Routes ----------
 @app.route("/", methods=["GET"])
 def index():
     uid = request.args.get("uid", "")
-    return render_template_string(HTML_FORM, uid=uid)
+    return _FORM_TMPL.render(uid=uid)
 
 @app.route("/health", methods=["GET"])
 def health():
@@ -132,47 +572,23 @@ def predict():
         return redirect(url_for("index", uid=request.args.get("uid", "")))
 
     image_file = request.files["image"]
-    image_bytes = image_file.read()
     user_id = request.args.get("uid")  # optional
 
     try:
-        x = preprocess_image(image_bytes)
-        model = get_model()
-        preds = model.predict(x)
-        label = LABELS[int(np.argmax(preds))]
+        # Retries of the same photo skip preprocessing and inference entirely
+        buf = upload_buffer(image_file.stream)
+        key = image_key(buf)
+        label = cached_label(key)
+        if label is None:
+            x = preprocess_image(image_file.stream, buf)
+            label = classify(x)
+            cache_label(key, label)
 
         # Save only if Firestore is ready and uid provided
         if db and user_id:
-            db.collection("users").document(user_id).collection("skin_records").add(
-                {"skin_type": label, "timestamp": firestore.SERVER_TIMESTAMP}
-            )
-
-        return f"""
-        <!doctype html>
-        <html>
-        <head>
-          <meta name="viewport" content="width=device-width, initial-scale=1.0">
-          <title>GlowCheck Result</title>
-          <style>
-            body {{ background: linear-gradient(135deg,#e6f0f2,#f8f8f8); font-family:'Poppins',sans-serif;
-                   display:flex; justify-content:center; align-items:center; height:100vh; margin:0; }}
-            .result-card {{ position:fixed; top:40px; left:50%; transform:translateX(-50%); background:#fff;
-                            padding:25px 20px; border-radius:15px; box-shadow:0 6px 18px rgba(0,0,0,.1);
-                            text-align:center; width:90%; max-width:360px; border:1px solid #7dacb5; }}
-            h3 {{ color:#5A827E; font-size:22px; font-weight:600; margin-bottom:25px; }}
-            a {{ text-decoration:none; color:#fff; background:#5A827E; padding:12px 20px; border-radius:10px;
-                 display:inline-block; transition:.3s; }}
-            a:hover {{ transform:scale(1.05); background:#4e6f6b; }}
-          </style>
-        </head>
-        <body>
-          <div class="result-card">
-            <h3>Your Skin Type: {label}</h3>
-            <a href="/?uid={user_id or ''}">Try Another</a>
-          </div>
-        </body>
-        </html>
-        """
+            save_record(user_id, label)
+
+        return _RESULT_TMPL.render(label=label, uid=user_id or "")
     except Exception as e:
         return f"<h3>Error: {str(e)}</h3><br><a href='/'>Back</a>"
 
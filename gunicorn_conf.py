@@ -0,0 +1,45 @@
+"""Gunicorn settings for the skin type detector."""
+import os
+import subprocess
+import sys
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# One process with a thread pool: request threads overlap upload I/O and
+# rendering with inference, which the batcher thread runs a batch at a time.
+# Enough threads to fill a whole batch by default.
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS") or os.getenv("BATCH_MAX", "16"))
+timeout = 120
+
+
+def on_starting(server):
+    """Download/convert the model once before forking.
+
+    Runs in a subprocess so TensorFlow never initializes in the master, and so
+    a slow first download isn't cut short by the worker timeout. A failure is
+    logged rather than raised: this runs before Gunicorn binds its socket, so
+    raising would keep even /health down. The worker retries on first use.
+    """
+    result = subprocess.run([sys.executable, "-c", "import a; a.ensure_model_file()"])
+    if result.returncode != 0:
+        server.log.error("Model preparation failed (exit %s); will retry on first request", result.returncode)
+
+
+def post_fork(server, worker):
+    """Load and warm the model in each worker before it accepts traffic."""
+    from a import get_model, start_batcher
+
+    start_batcher()
+    try:
+        get_model()
+    except Exception:
+        # Serve anyway; the batcher calls get_model() again on the first request
+        server.log.exception("Model warm-up failed; will retry on first request")
+
+
+def worker_exit(server, worker):
+    """Commit any Firestore records still queued before the worker goes away."""
+    from a import flush_records
+
+    flush_records()